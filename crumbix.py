@@ -1,80 +1,123 @@
 import sys
 import os
-import time
-import threading
-import queue
-from datetime import datetime
+import re
+import functools
 from urllib.parse import urlparse
 
 # Third-party imports
 import click
-import browser_cookie3
-import tldextract
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich.panel import Panel
-from rich.theme import Theme
-
-# Setup Rich Console for pretty output
-custom_theme = Theme({
-    "info": "cyan",
-    "warning": "yellow",
-    "error": "bold red",
-    "success": "bold green",
-    "highlight": "magenta",
-    "brand": "bold blue"
-})
-console = Console(theme=custom_theme)
+
+@functools.cache
+def get_console():
+    """
+    Returns the shared Rich Console, created on first use so `--help` skips terminal probing.
+    """
+    from rich.console import Console
+    from rich.theme import Theme
+
+    # Setup Rich Console for pretty output
+    custom_theme = Theme({
+        "info": "cyan",
+        "warning": "yellow",
+        "error": "bold red",
+        "success": "bold green",
+        "highlight": "magenta",
+        "brand": "bold blue"
+    })
+    return Console(theme=custom_theme)
+
+@functools.cache
+def get_tld_extract():
+    """
+    Returns the shared TLDExtract instance, building its suffix trie once per process.
+    """
+    import tldextract
+
+    # Offline mode: an empty suffix_list_urls tuple tells tldextract to NEVER try
+    # to download updates and use the internal snapshot.
+    return tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None, fallback_to_snapshot=True)
+
+# Netscape boolean fields, indexed by a bool
+_TF = ("FALSE", "TRUE")
 
 def get_netscape_format(cookie):
     """
     Converts a cookie object to a Netscape formatted string.
     """
     domain = cookie.domain
-    flag = "TRUE" if domain.startswith(".") else "FALSE"
-    path = cookie.path
-    secure = "TRUE" if cookie.secure else "FALSE"
-    expires = int(cookie.expires) if cookie.expires else 0
-    expiration = str(expires) if expires != 0 else "0"
-    name = cookie.name
-    value = cookie.value
+    return (
+        f"{domain}\t{_TF[domain[:1] == '.']}\t{cookie.path}\t"
+        f"{_TF[bool(cookie.secure)]}\t{int(cookie.expires or 0)}\t"
+        f"{cookie.name}\t{cookie.value}"
+    )
 
-    return f"{domain}\t{flag}\t{path}\t{secure}\t{expiration}\t{name}\t{value}"
+# TLDs whose public suffix list entry has no ICANN sub-suffixes, so the registered
+# domain is always the last two labels. Keep ccTLDs like uk/jp/fr/io out of here:
+# they have second-level suffixes (co.uk, com.io) that need the full trie.
+_FAST_TLDS = frozenset({"com", "org", "net", "edu", "gov", "dev", "app", "de"})
 
+@functools.lru_cache(maxsize=1024)
 def extract_domain(url):
     """
     Extracts the main domain from a URL.
     Handles standard domains (google.com) and local/IPs (localhost, 127.0.0.1).
     """
-    # Ensure scheme exists for parser
-    if not url.startswith(("http://", "https://")):
-        url = "http://" + url
-    
-    # Force offline mode by providing an empty tuple for suffix_list_urls
-    # This tells tldextract to NEVER try to download updates and use the internal snapshot
-    no_fetch_extract = tldextract.TLDExtract(suffix_list_urls=())
-    extracted = no_fetch_extract(url)
-    
-    # 1. Standard Domain (e.g., google.com)
+    # Strip any scheme, path, query and fragment; tldextract accepts bare hostnames
+    authority = re.split(r"[/?#]", url.split("://", 1)[-1], 1)[0]
+
+    # Drop credentials (user:pass@host), which would otherwise break the port split.
+    # This must only see the authority so an "@" in a query is never mistaken for it.
+    # Lowercase once so every branch returns the same canonical form.
+    host = authority.rpartition("@")[2].lower()
+
+    # 1. Fast path: IPv6 literal (e.g., [::1]:8080)
+    if host[:1] == "[":
+        return host[1:].split("]", 1)[0] or None
+
+    # 2. Fast path: localhost / IPv4 (e.g., localhost:3000, 127.0.0.1)
+    # These never need the suffix trie.
+    hostname = host.split(":", 1)[0]
+    if hostname == "localhost" or hostname.replace(".", "").isdigit():
+        return hostname
+
+    # 3. Fast path: common TLDs with no public second-level suffixes (e.g., www.google.com)
+    labels = hostname.split(".")
+    if len(labels) >= 2 and labels[-2] and labels[-1] in _FAST_TLDS:
+        return f"{labels[-2]}.{labels[-1]}"
+
+    extracted = get_tld_extract()(host)
+
+    # 4. Standard Domain (e.g., bbc.co.uk)
     if extracted.domain and extracted.suffix:
         return f"{extracted.domain}.{extracted.suffix}"
-        
-    # 2. Localhost / Intranet / IP (e.g., localhost, 127.0.0.1)
-    parsed = urlparse(url)
-    if parsed.hostname:
-        return parsed.hostname
-        
-    return None
 
-def fetch_cookies_threaded(loader, target_domain, result_queue):
-    """Runs the blocking loader in a separate thread."""
-    try:
-        # We try to fetch ONLY for the domain to speed it up.
-        # Note: browser_cookie3 might return a cookie jar or list.
-        cj = loader(domain_name=target_domain)
-        result_queue.put(("success", list(cj)))
-    except Exception as e:
-        result_queue.put(("error", e))
+    # 5. IP address missed by the fast paths
+    if extracted.ipv4 or extracted.ipv6:
+        return extracted.ipv4 or extracted.ipv6
+
+    # 6. Intranet / unlisted suffixes (e.g., router, wiki.corp, foo.ck):
+    # the whole hostname, already free of port, query and fragment
+    return hostname or None
+
+def load_cookies(loader, target_domain):
+    """
+    Loads cookies for target_domain and its subdomains using a browser_cookie3 loader.
+    """
+    # We try to fetch ONLY for the domain to speed it up.
+    # Note: browser_cookie3 might return a cookie jar or list.
+    cj = loader(domain_name=target_domain)
+
+    # Some backends return extra cookies despite domain_name, so keep
+    # only the target domain and its subdomains. Hosts are case-insensitive,
+    # like the loaders' own SQLite LIKE match.
+    target = target_domain.lower()
+    suffix = "." + target
+    # IPv6 hosts are stored bracketed (e.g., [::1])
+    exact = {target, f"[{target}]"} if ":" in target else {target}
+    return [
+        c for c in cj
+        if c.domain.lower() in exact or c.domain.lower().endswith(suffix)
+    ]
 
 @click.command()
 @click.argument("url")
@@ -97,6 +140,10 @@ def main(url, browser, output):
     (compatible with wget, curl, youtube-dl, etc.).
     """
     
+    from rich.panel import Panel
+
+    console = get_console()
+
     # 1. Branding Header
     console.print(Panel.fit(
         f"[brand]🍪 CRUMBIX[/brand]\n"
@@ -121,67 +168,53 @@ def main(url, browser, output):
         output = f"{target_domain}.cookies.txt"
 
     # 3. Resolve Browser Loader
-    loader_map = {
-        "chrome": browser_cookie3.chrome,
-        "firefox": browser_cookie3.firefox,
-        "brave": browser_cookie3.brave,
-        "edge": browser_cookie3.edge,
-        "chromium": browser_cookie3.chromium,
-        "opera": browser_cookie3.opera,
-        "safari": browser_cookie3.safari,
-    }
-    loader = loader_map.get(browser.lower())
-
-    # 4. Threaded Extraction
-    result_queue = queue.Queue()
-    extraction_thread = threading.Thread(
-        target=fetch_cookies_threaded,
-        args=(loader, target_domain, result_queue),
-        daemon=True
-    )
+    # Imported here: browser_cookie3 pulls in crypto/keyring backends at import time.
+    import browser_cookie3
 
-    cookies = []
-    
-    with Progress(
-        SpinnerColumn(style="bold magenta"),
-        TextColumn("[bold white]{task.description}"),
-        BarColumn(bar_width=None), # Spacer
-        console=console,
-        transient=True # Disappear when done
-    ) as progress:
-        
-        task = progress.add_task(f"Searching {browser.capitalize()} storage for [cyan]{target_domain}[/cyan]...", total=None)
-        
-        extraction_thread.start()
-        
-        # Keep the main thread alive to animate the spinner
-        # while waiting for the background thread
-        while extraction_thread.is_alive():
-            time.sleep(0.1)
-            
-        # Check results
-        if not result_queue.empty():
-            status, data = result_queue.get()
-            if status == "success":
-                cookies = data
-            else:
-                # Handle Errors
-                error_msg = str(data)
-                console.print(f"\n[error]❌ Failed to extract cookies from {browser}[/error]")
-                
-                if "Permission denied" in error_msg or "locked" in error_msg.lower():
-                    console.print(Panel(
-                        "[yellow]The browser database is locked or protected.[/yellow]\n\n"
-                        "1. [bold]Close the browser[/bold] completely and try again.\n"
-                        "2. On macOS/Linux, you might need sudo/keyring permissions.",
-                        title="Troubleshooting",
-                        border_style="yellow"
-                    ))
-                else:
-                    console.print(f"[dim]Error details: {error_msg}[/dim]")
-                sys.exit(1)
+    # Each --browser choice matches a browser_cookie3 loader of the same name
+    loader = getattr(browser_cookie3, browser.lower())
+
+    # 4. Extraction
+    search_msg = f"Searching {browser.capitalize()} storage for [cyan]{target_domain}[/cyan]..."
+
+    try:
+        if console.is_terminal:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+
+            with Progress(
+                SpinnerColumn(style="bold magenta"),
+                TextColumn("[bold white]{task.description}"),
+                BarColumn(bar_width=None), # Spacer
+                console=console,
+                transient=True # Disappear when done
+            ) as progress:
+                progress.add_task(search_msg, total=None)
+
+                # The loader is a blocking read; Rich's auto-refresh keeps the spinner moving.
+                cookies = load_cookies(loader, target_domain)
+        else:
+            # Piped or redirected: skip rendering spinner frames nobody will see
+            console.print(search_msg)
+            cookies = load_cookies(loader, target_domain)
+    except Exception as e:
+        # Handle Errors
+        error_msg = str(e)
+        console.print(f"\n[error]❌ Failed to extract cookies from {browser}[/error]")
+
+        if "Permission denied" in error_msg or "locked" in error_msg.lower():
+            console.print(Panel(
+                "[yellow]The browser database is locked or protected.[/yellow]\n\n"
+                "1. [bold]Close the browser[/bold] completely and try again.\n"
+                "2. On macOS/Linux, you might need sudo/keyring permissions.",
+                title="Troubleshooting",
+                border_style="yellow"
+            ))
+        else:
+            console.print(f"[dim]Error details: {error_msg}[/dim]")
+        sys.exit(1)
 
     # 5. Save & Summary
+    # Bail out before touching the clock or the filesystem when there is nothing to write
     if not cookies:
         console.print(Panel(
             f"[warning]⚠️  No cookies found for {target_domain}[/warning]\n\n"
@@ -191,17 +224,23 @@ def main(url, browser, output):
         ))
         sys.exit(0)
 
+    from datetime import datetime
+
     try:
-        with open(output, "w", encoding="utf-8") as f:
-            f.write("# Netscape HTTP Cookie File\n")
-            f.write(f"# Generated by Crumbix on {datetime.now()}\n")
-            f.write("# http://curl.haxx.se/rfc/cookie_spec.html\n\n")
-            
-            for cookie in cookies:
-                f.write(get_netscape_format(cookie) + "\n")
+        with open(output, "w", encoding="utf-8", buffering=65536) as f:
+            header = (
+                "# Netscape HTTP Cookie File\n"
+                f"# Generated by Crumbix on {datetime.now()}\n"
+                "# http://curl.haxx.se/rfc/cookie_spec.html\n\n"
+            )
+
+            f.write(header)
+            # Stream the lines so large jars are never materialized twice
+            f.writelines(get_netscape_format(cookie) + "\n" for cookie in cookies)
                 
         console.print(f"[success]✅ Extracted {len(cookies)} cookies![/success]")
-        console.print(f"📁 [dim]Saved to:[/dim] [link=file://{os.path.abspath(output)}]{output}[/link]")
+        link = output if os.path.isabs(output) else os.path.join(os.getcwd(), output)
+        console.print(f"📁 [dim]Saved to:[/dim] [link=file://{link}]{output}[/link]")
         
     except IOError as e:
         console.print(f"[error]❌ File Error:[/error] {str(e)}")